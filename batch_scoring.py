@@ -0,0 +1,206 @@
+# batch_scoring.py
+import csv
+import os
+import numpy as np
+from multiprocessing import Pool
+
+from dtw_core import DTW, fast_DTW
+from feature_store import SharedFeatureStore
+
+class BatchScores:
+    """
+    DTW distances from a batch of test utterances to every reference template.
+
+    The (num_utterances, num_templates) distance array is the stored result;
+    predictions, top-K labels and confidences are derived from it, so accuracy,
+    confusion matrices and per-speaker breakdowns (see evaluation.py) need no
+    further DTW work.
+
+    Confidence is the relative margin between the best and second-best template,
+    (d2 - d1) / d2, which is 0 for a tie and approaches 1 for a clear winner.
+    """
+
+    def __init__(self, template_labels, utterance_ids, distances, true_labels=None, speakers=None, top_k=3):
+        self.template_labels = np.asarray(template_labels, dtype=str)
+        self.utterance_ids = np.asarray(utterance_ids, dtype=str)
+        self.distances = np.asarray(distances, dtype=float).reshape(len(self.utterance_ids), len(self.template_labels))
+        self.true_labels = None if true_labels is None else np.asarray(true_labels, dtype=str)
+        self.speakers = None if speakers is None else np.asarray(speakers, dtype=str)
+        if len(self.template_labels) == 0:
+            raise ValueError("BatchScores needs at least one reference template.")
+        self.top_k = max(1, min(int(top_k), len(self.template_labels)))
+
+        order = np.argsort(self.distances, axis=1, kind='stable')
+        self.top_k_indices = order[:, :self.top_k]
+        self.top_k_labels = self.template_labels[self.top_k_indices]
+        self.top_k_distances = np.take_along_axis(self.distances, self.top_k_indices, axis=1)
+
+        rows = np.arange(len(order))
+        best = self.distances[rows, order[:, 0]]
+        second = self.distances[rows, order[:, 1]] if order.shape[1] > 1 else np.full(len(order), np.inf)
+        # Two zero distances are an exact tie (0); with no finite runner-up the best template is unopposed (1).
+        with np.errstate(divide='ignore', invalid='ignore'):
+            margin = np.where(second > 0, (second - best) / second, 0.0)
+        margin = np.where(np.isfinite(second), margin, 1.0)
+        self.confidence = np.where(np.isfinite(best), margin, 0.0)
+
+    def __len__(self):
+        return len(self.utterance_ids)
+
+    @property
+    def predicted_labels(self):
+        return self.top_k_labels[:, 0]
+
+    def _columns(self):
+        """ Flat per-utterance columns shared by the CSV and Parquet exports. """
+        columns = {'utterance_id': self.utterance_ids}
+        if self.true_labels is not None:
+            columns['true_label'] = self.true_labels
+        if self.speakers is not None:
+            columns['speaker'] = self.speakers
+        columns['predicted_label'] = self.predicted_labels
+        columns['confidence'] = self.confidence
+        for rank in range(self.top_k):
+            columns[f'top{rank + 1}_label'] = self.top_k_labels[:, rank]
+            columns[f'top{rank + 1}_distance'] = self.top_k_distances[:, rank]
+        for t, label in enumerate(self.template_labels):
+            columns[f'distance_{label}'] = self.distances[:, t]
+        return columns
+
+    def save_npz(self, path):
+        """ Writes all arrays to a single compressed .npz file and returns its path. """
+        # np.savez_compressed appends .npz itself; do it here so the returned path is the written one.
+        if not path.endswith('.npz'):
+            path += '.npz'
+        _ensure_parent_dir(path)
+        arrays = {
+            'template_labels': self.template_labels,
+            'utterance_ids': self.utterance_ids,
+            'distances': self.distances,
+            'top_k': np.array(self.top_k),
+        }
+        if self.true_labels is not None:
+            arrays['true_labels'] = self.true_labels
+        if self.speakers is not None:
+            arrays['speakers'] = self.speakers
+        np.savez_compressed(path, **arrays)
+        print(f"Batch scores saved to {path}")
+        return path
+
+    @classmethod
+    def load_npz(cls, path):
+        with np.load(path) as data:
+            return cls(data['template_labels'], data['utterance_ids'], data['distances'],
+                       true_labels=data['true_labels'] if 'true_labels' in data else None,
+                       speakers=data['speakers'] if 'speakers' in data else None,
+                       top_k=int(data['top_k']))
+
+    def save_csv(self, path):
+        """ Writes one row per utterance, with every template distance as a column. """
+        _ensure_parent_dir(path)
+        columns = self._columns()
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns.keys())
+            writer.writerows(zip(*columns.values()))
+        print(f"Batch scores saved to {path}")
+        return path
+
+    def save_parquet(self, path):
+        """ Writes the same table as save_csv to Parquet. Requires pandas and pyarrow. """
+        try:
+            import pandas as pd
+        except ImportError as e:
+            raise ImportError("Parquet export requires pandas (and pyarrow): pip install pandas pyarrow") from e
+        _ensure_parent_dir(path)
+        pd.DataFrame(self._columns()).to_parquet(path, index=False)
+        print(f"Batch scores saved to {path}")
+        return path
+
+
+def _ensure_parent_dir(path):
+    parent_dir = os.path.dirname(path)
+    if parent_dir and not os.path.exists(parent_dir):
+        os.makedirs(parent_dir)
+
+
+def _distance_row(train_mfcc_dict, test_mfcc, template_labels, fast_dtw_radius):
+    row = np.empty(len(template_labels))
+    for t, label in enumerate(template_labels):
+        if fast_dtw_radius is None:
+            row[t], _, _ = DTW(test_mfcc, train_mfcc_dict[label])
+        else:
+            row[t], _, _ = fast_DTW(test_mfcc, train_mfcc_dict[label], radius=fast_dtw_radius)
+    return row
+
+
+_worker_state = {}
+
+def _init_scoring_worker(train_store, test_store, template_labels, fast_dtw_radius):
+    # Runs once per pool worker: the stores arrive as descriptors and attach to the shared block here.
+    _worker_state.update(train_store=train_store, test_store=test_store,
+                         template_labels=template_labels, fast_dtw_radius=fast_dtw_radius)
+
+def _score_utterance(utterance_id):
+    return _distance_row(_worker_state['train_store'], _worker_state['test_store'][utterance_id],
+                         _worker_state['template_labels'], _worker_state['fast_dtw_radius'])
+
+
+def score_batch(train_mfcc_dict, test_mfcc_dict, true_labels=None, speakers=None,
+                top_k=3, fast_dtw_radius=None, num_workers=None):
+    """
+    Computes the DTW distance from every test utterance to every training template.
+
+    Args:
+        train_mfcc_dict (dict): Template label -> MFCC array. None entries are skipped.
+        test_mfcc_dict (dict): Utterance id -> MFCC array. None entries are skipped,
+            as in calculate_accuracy_and_confusion_matrix.
+        true_labels (dict, optional): Utterance id -> true label.
+        speakers (dict, optional): Utterance id -> speaker id.
+        top_k (int): Number of best templates kept per utterance.
+        fast_dtw_radius (int, optional): Use fast_DTW with this radius instead of exact DTW.
+        num_workers (int, optional): If above 1, utterances are scored in a process pool.
+            Features are shared with the workers through SharedFeatureStore rather than copied.
+
+    Returns:
+        BatchScores: The scores for all non-None test utterances.
+    """
+    template_labels = [label for label, mfcc in train_mfcc_dict.items() if mfcc is not None]
+    utterance_ids = [utt_id for utt_id, mfcc in test_mfcc_dict.items() if mfcc is not None]
+
+    if num_workers is not None and num_workers > 1 and utterance_ids:
+        train_mfcc = {label: train_mfcc_dict[label] for label in template_labels}
+        test_mfcc = {utt_id: test_mfcc_dict[utt_id] for utt_id in utterance_ids}
+        with SharedFeatureStore.from_mfcc_dict(train_mfcc) as train_store, \
+             SharedFeatureStore.from_mfcc_dict(test_mfcc) as test_store:
+            with Pool(processes=num_workers, initializer=_init_scoring_worker,
+                      initargs=(train_store, test_store, template_labels, fast_dtw_radius)) as pool:
+                rows = pool.map(_score_utterance, utterance_ids)
+    else:
+        rows = [_distance_row(train_mfcc_dict, test_mfcc_dict[utt_id], template_labels, fast_dtw_radius)
+                for utt_id in utterance_ids]
+    distances = np.array(rows, dtype=float).reshape(len(utterance_ids), len(template_labels))
+
+    return BatchScores(template_labels, utterance_ids, distances,
+                       true_labels=None if true_labels is None else [true_labels[u] for u in utterance_ids],
+                       speakers=None if speakers is None else [speakers[u] for u in utterance_ids],
+                       top_k=top_k)
+
+
+if __name__ == '__main__':
+    print("Running Batch Scoring Example...")
+    dummy_train_mfcc = {"one": np.random.rand(50, 13), "two": np.random.rand(55, 13), "three": np.random.rand(45, 13)}
+    dummy_test_mfcc = {f"utt_{i}": np.random.rand(48, 13) for i in range(4)}
+    dummy_true = {utt_id: "one" for utt_id in dummy_test_mfcc}
+
+    scores = score_batch(dummy_train_mfcc, dummy_test_mfcc, true_labels=dummy_true, top_k=2)
+    for utt_id, labels, conf in zip(scores.utterance_ids, scores.top_k_labels, scores.confidence):
+        print(f"  {utt_id}: top-2 {list(labels)}, confidence {conf:.3f}")
+
+    if not os.path.exists("plots"):
+        os.makedirs("plots")
+    scores.save_npz("plots/batch_scoring_example.npz")
+    scores.save_csv("plots/batch_scoring_example.csv")
+    reloaded = BatchScores.load_npz("plots/batch_scoring_example.npz")
+    assert np.array_equal(reloaded.distances, scores.distances)
+    print("Batch Scoring Example Finished.")
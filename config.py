@@ -3,6 +3,10 @@
 # --- General Configuration ---
 DIGITS_ORDERED = ["zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
 MFCC_PARAMS = {'fft_length': 1103, 'num_cepstral': 13} # Consistent MFCC parameters
+PLOT_WORKERS = 2 # Background processes used to render plots (None = one per CPU)
+SCORES_DIR = "scores/" # Batch score exports (all template distances per utterance)
+SCORES_TOP_K = 3 # Best templates kept per utterance in batch scores
+SCORING_WORKERS = 4 # Processes for batch DTW scoring, sharing features via SharedFeatureStore (None = main process only)
 
 # --- Paths for Your Recorded Data (Part B) ---
 # Assumes 'data' folder is in the same directory as main_assignment.py
@@ -16,6 +20,9 @@ TDIGITS_DIGITS_STR = [str(i) for i in range(10)] # '0' through '9'
 TDIGITS_REFERENCE_REPETITION = '0'
 TDIGITS_NUM_TEST_REPETITIONS = 50 # Max repetitions to check per speaker/digit
 
+# --- Approximate (FastDTW-style) DTW ---
+FAST_DTW_VALIDATION_RADII = [1, 3, 10] # Radii compared against exact DTW by fast_dtw_validation.py
+
 # --- Control which parts of the assignment to run ---
 RUN_PART_A = True
 RUN_PART_B = True
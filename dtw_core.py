@@ -2,8 +2,34 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import os
+from scipy.spatial.distance import cdist
 
-def DTW(sequence1, sequence2):
+def compute_local_cost_matrix(sequence1, sequence2):
+    """
+    Computes the pairwise Euclidean distance between every element of two sequences.
+
+    Args:
+        sequence1 (list or np.array): The first sequence (M elements).
+        sequence2 (list or np.array): The second sequence (N elements).
+
+    Returns:
+        np.array: The (M, N) local cost matrix.
+    """
+    s1 = _as_frames(sequence1)
+    s2 = _as_frames(sequence2)
+    # cdist works in O(M*N) memory; broadcasting the difference would need M*N*D.
+    return cdist(s1, s2, metric='euclidean')
+
+
+def _as_frames(sequence):
+    """ Returns a sequence as a 2-D float array with one row per element. """
+    frames = np.asarray(sequence, dtype=float)
+    if frames.ndim == 1:
+        frames = frames[:, np.newaxis]
+    return frames
+
+
+def DTW(sequence1, sequence2, local_cost_matrix=None):
     """
     Computes the Dynamic Time Warping (DTW) distance between two sequences.
     
@@ -11,6 +37,8 @@ def DTW(sequence1, sequence2):
         sequence1 (list or np.array): The first sequence (M elements).
         sequence2 (list or np.array): The second sequence (N elements).
         Each element can be a scalar or a vector (for MFCCs).
+        local_cost_matrix (np.array, optional): Precomputed (M, N) local cost matrix,
+            e.g. from compute_local_cost_matrix. Computed here if None.
         
     Returns:
         tuple: (opt_distance, optimal_path, DTW_cumulate_Matrix)
@@ -21,14 +49,14 @@ def DTW(sequence1, sequence2):
     M = len(sequence1)
     N = len(sequence2)
 
-    s1 = np.array(sequence1)
-    s2 = np.array(sequence2)
+    if local_cost_matrix is None:
+        local_cost_matrix = compute_local_cost_matrix(sequence1, sequence2)
 
     DTW_cumulate_Matrix = np.zeros((M, N))
 
     for i in range(M):
         for j in range(N):
-            local_cost = np.linalg.norm(s1[i] - s2[j])
+            local_cost = local_cost_matrix[i, j]
             if i == 0 and j == 0:
                 DTW_cumulate_Matrix[i, j] = local_cost
             elif i == 0:
@@ -70,7 +98,163 @@ def DTW(sequence1, sequence2):
     return opt_distance, optimal_path, DTW_cumulate_Matrix
 
 
-def plotDTWpath(sequence1, sequence2, title_prefix="", save_path=None):
+def fast_DTW(sequence1, sequence2, radius=1):
+    """
+    Approximates DTW with the multiscale (FastDTW-style) scheme: both sequences
+    are coarsened by averaging pairs of frames, the alignment is solved at the
+    lowest resolution, and each finer level only searches a corridor around the
+    projected coarse path, widened by `radius` frames. Time and memory grow
+    linearly with sequence length instead of quadratically.
+
+    Args:
+        sequence1 (list or np.array): The first sequence (M elements).
+        sequence2 (list or np.array): The second sequence (N elements).
+        radius (int): Extra cells searched on each side of the projected path.
+            Larger values are slower but closer to exact DTW.
+
+    Returns:
+        tuple: (opt_distance, optimal_path, None)
+            - opt_distance (float): The approximate DTW distance (never below the exact one).
+            - optimal_path (list of tuples): The warping path found [(i0,j0), (i1,j1), ...].
+            - None: No full accumulated cost matrix is built in this mode.
+    """
+    if radius < 0:
+        raise ValueError(f"radius must be non-negative, got {radius}")
+    opt_distance, optimal_path = _fast_DTW(_as_frames(sequence1), _as_frames(sequence2), radius)
+    return opt_distance, optimal_path, None
+
+
+def _fast_DTW(s1, s2, radius):
+    M = len(s1)
+    N = len(s2)
+    min_size = radius + 2
+    if M < min_size or N < min_size:
+        opt_distance, optimal_path, _ = DTW(s1, s2)
+        return opt_distance, optimal_path
+
+    _, coarse_path = _fast_DTW(_reduce_by_half(s1), _reduce_by_half(s2), radius)
+    row_start, row_end = _project_window(coarse_path, M, N, radius)
+    return _windowed_DTW(s1, s2, row_start, row_end)
+
+
+def _reduce_by_half(frames):
+    """ Halves the resolution by averaging consecutive pairs of frames. """
+    even_length = len(frames) - len(frames) % 2
+    return (frames[0:even_length:2] + frames[1:even_length:2]) / 2
+
+
+def _project_window(coarse_path, M, N, radius):
+    """
+    Projects a coarse path to the next resolution and widens it by `radius`.
+
+    Returns:
+        tuple: (row_start, row_end) arrays giving the inclusive column range
+            searched in each of the M rows.
+    """
+    coarse = np.array(coarse_path)
+    row_start = np.full(M, N, dtype=int)
+    row_end = np.full(M, -1, dtype=int)
+    for offset in range(-radius, radius + 1):
+        # Each coarse cell covers a 2x2 block of fine cells.
+        for sub_row in (0, 1):
+            rows = 2 * (coarse[:, 0] + offset) + sub_row
+            valid = (rows >= 0) & (rows < M)
+            cols_lo = np.clip(2 * (coarse[valid, 1] - radius), 0, N - 1)
+            cols_hi = np.clip(2 * (coarse[valid, 1] + radius) + 1, 0, N - 1)
+            np.minimum.at(row_start, rows[valid], cols_lo)
+            np.maximum.at(row_end, rows[valid], cols_hi)
+
+    # A trailing odd frame is dropped when coarsening, so the last row may be
+    # uncovered; it inherits the previous row's range. Then make the corridor
+    # monotone, connected, and anchored at both corners.
+    for i in range(1, M):
+        if row_end[i] < 0:
+            row_start[i], row_end[i] = row_start[i-1], row_end[i-1]
+    row_start[0] = 0
+    row_end[M-1] = N - 1
+    row_start = np.minimum.accumulate(row_start[::-1])[::-1]
+    row_end = np.maximum.accumulate(row_end)
+    row_start[1:] = np.minimum(row_start[1:], row_end[:-1] + 1)
+    return row_start, row_end
+
+
+def _windowed_DTW(s1, s2, row_start, row_end):
+    """
+    DTW restricted to the cells [row_start[i], row_end[i]] of each row i.
+    Uses the same recurrence and path tie-breaking as DTW.
+    """
+    M = len(s1)
+    rows = []
+
+    def accumulated(i, j):
+        if i < 0 or j < row_start[i] or j > row_end[i]:
+            return np.inf
+        return rows[i][j - row_start[i]]
+
+    for i in range(M):
+        start, end = row_start[i], row_end[i]
+        local_costs = np.linalg.norm(s2[start:end + 1] - s1[i], axis=-1)
+
+        # Best of the vertical and diagonal predecessors for the whole row at once;
+        # only the horizontal dependency needs the per-cell loop below.
+        from_previous_row = np.full(end - start + 2, np.inf)
+        if i > 0:
+            # from_previous_row[k] holds D[i-1, start+k-1] for k = 0 .. end-start+1.
+            prev_start, prev_end = row_start[i-1], row_end[i-1]
+            lo = max(prev_start, start - 1)
+            hi = min(prev_end, end)
+            if lo <= hi:
+                from_previous_row[lo - start + 1:hi - start + 2] = rows[i-1][lo - prev_start:hi - prev_start + 1]
+        best_previous = np.minimum(from_previous_row[1:], from_previous_row[:-1])
+        if i == 0:
+            best_previous[0] = 0.0
+
+        row = local_costs + best_previous
+        for k in range(1, len(row)):
+            horizontal = local_costs[k] + row[k-1]
+            if horizontal < row[k]:
+                row[k] = horizontal
+        rows.append(row)
+
+    i = M - 1
+    j = row_end[M-1]
+    opt_distance = accumulated(i, j)
+    optimal_path = [(i, j)]
+
+    while i > 0 or j > 0:
+        diagonal = accumulated(i-1, j-1)
+        vertical = accumulated(i-1, j)
+        horizontal = accumulated(i, j-1)
+        if diagonal <= vertical and diagonal <= horizontal:
+            i -= 1
+            j -= 1
+        elif vertical <= diagonal and vertical <= horizontal:
+            i -= 1
+        else:
+            j -= 1
+        optimal_path.append((i, j))
+
+    optimal_path = optimal_path[::-1]
+    return float(opt_distance), optimal_path
+
+
+def prepare_dtw_plot_data(sequence1, sequence2, local_cost_matrix=None, dtw_result=None):
+    """
+    Fills in whichever of the local cost matrix and DTW result were not supplied,
+    reusing the cost matrix for DTW.
+
+    Returns:
+        tuple: (local_cost_matrix, dtw_result)
+    """
+    if local_cost_matrix is None:
+        local_cost_matrix = compute_local_cost_matrix(sequence1, sequence2)
+    if dtw_result is None:
+        dtw_result = DTW(sequence1, sequence2, local_cost_matrix=local_cost_matrix)
+    return local_cost_matrix, dtw_result
+
+
+def plotDTWpath(sequence1, sequence2, title_prefix="", save_path=None,
+                local_cost_matrix=None, dtw_result=None):
     """
     Computes and plots the DTW path on local cost and accumulated cost matrices.
     Saves the plot if save_path is provided.
@@ -80,21 +264,27 @@ def plotDTWpath(sequence1, sequence2, title_prefix="", save_path=None):
         sequence2 (list or np.array): The second sequence.
         title_prefix (str): String to prepend to plot titles.
         save_path (str, optional): Path to save the figure. If None, shows the plot.
+        local_cost_matrix (np.array, optional): Precomputed local cost matrix to reuse.
+        dtw_result (tuple, optional): Precomputed DTW(sequence1, sequence2) result to reuse.
 
     Returns:
         str: Path to the saved figure if save_path is provided, else None.
     """
-    s1 = np.array(sequence1)
-    s2 = np.array(sequence2)
-    M = len(s1)
-    N = len(s2)
+    local_cost_matrix, dtw_result = prepare_dtw_plot_data(sequence1, sequence2, local_cost_matrix, dtw_result)
+    optimal_distance, optimal_path, DTW_accumulated_matrix = dtw_result
+    return render_dtw_plot(local_cost_matrix, DTW_accumulated_matrix, optimal_path, optimal_distance,
+                           title_prefix=title_prefix, save_path=save_path)
 
-    distance_matrix = np.zeros((M, N))
-    for i in range(M):
-        for j in range(N):
-            distance_matrix[i, j] = np.linalg.norm(s1[i] - s2[j])
 
-    optimal_distance, optimal_path, DTW_accumulated_matrix = DTW(s1, s2)
+def render_dtw_plot(distance_matrix, DTW_accumulated_matrix, optimal_path, optimal_distance,
+                    title_prefix="", save_path=None):
+    """
+    Draws already computed DTW matrices and path. Does no DTW work itself, so it
+    can be handed to a background plotting process (see plot_renderer.py).
+
+    Returns:
+        str: Path to the saved figure if save_path is provided, else None.
+    """
     optimal_path_array = np.array(optimal_path)
 
     fig = plt.figure(figsize=(12, 6))
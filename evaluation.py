@@ -4,58 +4,90 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import os
 from audio_processing import compute_mfcc
-from recognition_system import isolated_digit_recognition
+from batch_scoring import score_batch
 
-def calculate_accuracy_and_confusion_matrix(train_mfcc_dict, 
-                                            test_sets_mfcc_list, 
-                                            digits_ordered):
+def score_test_sets(train_mfcc_dict, test_sets_mfcc_list, digits_ordered, top_k=3, num_workers=None):
     """
-    Calculates accuracy and confusion matrix for digit recognition.
+    Scores every test set against the training templates in one batch.
+    Utterances are identified as 'set<N>_<digit>'.
     """
-    num_digits = len(digits_ordered)
-    total_correct_recognitions = 0
-    total_test_samples = 0
-    confusion_mat_array = np.zeros((num_digits, num_digits), dtype=int)
-    digit_to_index = {name: i for i, name in enumerate(digits_ordered)}
-
-    if not train_mfcc_dict or all(v is None for v in train_mfcc_dict.values()):
-        print("Error: Training MFCC data is empty or all None for evaluation.")
-        return 0.0, confusion_mat_array
-    
+    test_mfcc_dict = {}
+    true_labels = {}
     for test_set_index, current_test_mfcc_set in enumerate(test_sets_mfcc_list):
-        # print(f"Evaluating Test Set {test_set_index + 1}...") # Verbose
         if not current_test_mfcc_set:
-            # print(f"  Warning: Test Set {test_set_index + 1} is empty. Skipping.") # Verbose
             continue
-            
         for true_digit_name in digits_ordered:
             test_mfcc = current_test_mfcc_set.get(true_digit_name) # Use .get()
             if test_mfcc is None:
-                continue 
+                continue
+            utterance_id = f"set{test_set_index + 1}_{true_digit_name}"
+            test_mfcc_dict[utterance_id] = test_mfcc
+            true_labels[utterance_id] = true_digit_name
+    return score_batch(train_mfcc_dict, test_mfcc_dict, true_labels=true_labels, top_k=top_k, num_workers=num_workers)
 
-            total_test_samples += 1
-            
-            recognized_digit_name, _ = isolated_digit_recognition(train_mfcc_dict, test_mfcc)
 
-            if recognized_digit_name is None:
-                # print(f"  Recognition failed for test sample of '{true_digit_name}'.") # Verbose
-                continue
+def accuracy_and_confusion_matrix_from_scores(scores, digits_ordered):
+    """
+    Calculates accuracy and confusion matrix from stored BatchScores (no DTW work).
+    """
+    if scores.true_labels is None:
+        raise ValueError("BatchScores has no true_labels; pass true_labels to score_batch to evaluate accuracy.")
+
+    num_digits = len(digits_ordered)
+    confusion_mat_array = np.zeros((num_digits, num_digits), dtype=int)
+    digit_to_index = {name: i for i, name in enumerate(digits_ordered)}
 
-            true_label_idx = digit_to_index[true_digit_name]
-            predicted_label_idx = digit_to_index.get(recognized_digit_name, -1)
+    if len(scores) == 0:
+        return 0.0, confusion_mat_array
 
-            if predicted_label_idx != -1:
-                confusion_mat_array[true_label_idx, predicted_label_idx] += 1
-            # else:
-                # print(f"  Warning: Reco digit '{recognized_digit_name}' not in map.") # Verbose
+    for true_digit_name, recognized_digit_name in zip(scores.true_labels, scores.predicted_labels):
+        true_label_idx = digit_to_index.get(true_digit_name, -1)
+        predicted_label_idx = digit_to_index.get(recognized_digit_name, -1)
+        if true_label_idx != -1 and predicted_label_idx != -1:
+            confusion_mat_array[true_label_idx, predicted_label_idx] += 1
 
-            if recognized_digit_name == true_digit_name:
-                total_correct_recognitions += 1
-    
-    accuracy = (total_correct_recognitions / total_test_samples) if total_test_samples > 0 else 0.0
+    accuracy = float(np.mean(scores.true_labels == scores.predicted_labels))
     return accuracy, confusion_mat_array
 
 
+def per_speaker_accuracy_from_scores(scores):
+    """
+    Breaks stored BatchScores down by speaker (no DTW work).
+
+    Returns:
+        dict: speaker -> (accuracy, total_correct, total_tested), as returned by evaluate_on_tdigits.
+    """
+    if scores.true_labels is None:
+        raise ValueError("BatchScores has no true_labels; pass true_labels to score_batch to evaluate accuracy.")
+    if scores.speakers is None:
+        raise ValueError("BatchScores has no speakers; pass speakers to score_batch for a per-speaker breakdown.")
+
+    results = {}
+    correct = scores.true_labels == scores.predicted_labels
+    for speaker in dict.fromkeys(scores.speakers):
+        speaker_mask = scores.speakers == speaker
+        total_tested = int(speaker_mask.sum())
+        total_correct = int(correct[speaker_mask].sum())
+        results[speaker] = (total_correct / total_tested, total_correct, total_tested)
+    return results
+
+
+def calculate_accuracy_and_confusion_matrix(train_mfcc_dict, 
+                                            test_sets_mfcc_list, 
+                                            digits_ordered):
+    """
+    Calculates accuracy and confusion matrix for digit recognition.
+    """
+    num_digits = len(digits_ordered)
+
+    if not train_mfcc_dict or all(v is None for v in train_mfcc_dict.values()):
+        print("Error: Training MFCC data is empty or all None for evaluation.")
+        return 0.0, np.zeros((num_digits, num_digits), dtype=int)
+
+    scores = score_test_sets(train_mfcc_dict, test_sets_mfcc_list, digits_ordered)
+    return accuracy_and_confusion_matrix_from_scores(scores, digits_ordered)
+
+
 def plot_confusion_matrix(confusion_mat_array, digits_ordered, accuracy, save_path=None):
     """ Plots and optionally saves the confusion matrix. """
     fig = plt.figure(figsize=(10, 8))
@@ -105,42 +137,62 @@ def load_tdigits_reference_mfcc(base_path, speaker_id, digits_list, rep_id, mfcc
     print("TDIGITS Reference MFCCs loaded for this speaker.")
     return reference_mfcc_dict
 
-def evaluate_on_tdigits(reference_mfccs, test_speaker_id, digits_list, base_path, 
-                        num_test_repetitions=50, reference_repetition_id='0', 
-                        reference_speaker_id="ref_speaker", mfcc_params=None):
-    total_correct = 0
-    total_tested = 0
-    
+def load_tdigits_test_mfcc(base_path, speakers, digits_list, num_test_repetitions=50,
+                           reference_speaker_id=None, reference_repetition_id='0', mfcc_params=None):
+    """
+    Loads TDIGITS test utterances as a list of (utterance_id, speaker, true_digit, mfcc),
+    skipping the reference recording itself. The utterance id is the file name stem.
+    """
     if mfcc_params is None:
         mfcc_params = {}
 
+    test_utterances = []
+    for speaker in speakers:
+        for digit in digits_list:
+            for rep_idx in range(num_test_repetitions):
+                if speaker == reference_speaker_id and str(rep_idx) == reference_repetition_id:
+                    continue
+                utterance_id = f"{digit}_{speaker}_{rep_idx}"
+                audio_path = os.path.join(base_path, speaker, f"{utterance_id}.wav")
+                if not os.path.exists(audio_path):
+                    continue
+                mfccs = compute_mfcc(audio_path, **mfcc_params)
+                if mfccs is not None:
+                    test_utterances.append((utterance_id, speaker, digit, mfccs))
+    return test_utterances
+
+def score_tdigits(reference_mfccs, test_utterances, top_k=3, num_workers=None):
+    """
+    Scores TDIGITS test utterances (from load_tdigits_test_mfcc) against the
+    reference templates in one batch, keeping the speaker of each utterance.
+    """
+    test_mfcc_dict = {utt_id: mfcc for utt_id, _, _, mfcc in test_utterances}
+    true_labels = {utt_id: digit for utt_id, _, digit, _ in test_utterances}
+    speakers = {utt_id: speaker for utt_id, speaker, _, _ in test_utterances}
+    return score_batch(reference_mfccs, test_mfcc_dict, true_labels=true_labels, speakers=speakers,
+                       top_k=top_k, num_workers=num_workers)
+
+def evaluate_on_tdigits(reference_mfccs, test_speaker_id, digits_list, base_path, 
+                        num_test_repetitions=50, reference_repetition_id='0', 
+                        reference_speaker_id="ref_speaker", mfcc_params=None, num_workers=None):
+    """
+    Evaluates one TDIGITS test speaker against the reference templates.
+    Thin wrapper over load_tdigits_test_mfcc, score_tdigits and per_speaker_accuracy_from_scores.
+
+    Returns:
+        tuple: (accuracy, total_correct, total_tested)
+    """
     print(f"Evaluating TDIGITS: Ref '{reference_speaker_id}', Test '{test_speaker_id}'")
     if not reference_mfccs or all(v is None for v in reference_mfccs.values()):
         print(f"Error: Ref MFCCs missing/empty for speaker '{reference_speaker_id}'. Cannot evaluate {test_speaker_id}.")
         return 0.0, 0, 0
 
-    for true_digit in digits_list:
-        for rep_idx in range(num_test_repetitions):
-            if test_speaker_id == reference_speaker_id and str(rep_idx) == reference_repetition_id:
-                continue
-            
-            test_audio_filename = f"{true_digit}_{test_speaker_id}_{rep_idx}.wav"
-            test_audio_path = os.path.join(base_path, test_speaker_id, test_audio_filename)
-
-            if not os.path.exists(test_audio_path):
-                continue
-
-            test_mfcc = compute_mfcc(test_audio_path, **mfcc_params)
-            if test_mfcc is None:
-                continue
-            
-            total_tested += 1
-            recognized_digit, _ = isolated_digit_recognition(reference_mfccs, test_mfcc)
-
-            if recognized_digit == true_digit:
-                total_correct += 1
-
-    accuracy = (total_correct / total_tested) if total_tested > 0 else 0.0
+    test_utterances = load_tdigits_test_mfcc(base_path, [test_speaker_id], digits_list, num_test_repetitions,
+                                             reference_speaker_id=reference_speaker_id,
+                                             reference_repetition_id=reference_repetition_id,
+                                             mfcc_params=mfcc_params)
+    scores = score_tdigits(reference_mfccs, test_utterances, num_workers=num_workers)
+    accuracy, total_correct, total_tested = per_speaker_accuracy_from_scores(scores).get(test_speaker_id, (0.0, 0, 0))
     print(f"  Results: {total_correct}/{total_tested}. Acc: {accuracy*100:.2f}%")
     return accuracy, total_correct, total_tested
 
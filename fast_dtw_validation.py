@@ -0,0 +1,82 @@
+# fast_dtw_validation.py
+import time
+import numpy as np
+
+from batch_scoring import score_batch
+from evaluation import load_tdigits_reference_mfcc, load_tdigits_test_mfcc
+import config
+
+def compare_fast_dtw_to_exact(reference_mfccs, test_utterances, radii):
+    """
+    Scores every test utterance against every reference template with exact DTW
+    and with fast_DTW at each radius, and summarises how far they disagree.
+
+    Args:
+        reference_mfccs (dict): Template label -> MFCC array (None entries are skipped).
+        test_utterances (list): (utterance_id, speaker, true_label, mfcc) tuples,
+            as returned by load_tdigits_test_mfcc.
+        radii (list of int): fast_DTW radii to evaluate.
+
+    Returns:
+        dict: radius -> summary dict with decision disagreement rate, accuracies,
+            relative distance errors and timings (the exact results are repeated
+            in each summary for comparison).
+    """
+    test_mfcc_dict = {utt_id: mfcc for utt_id, _, _, mfcc in test_utterances}
+    true_labels = {utt_id: digit for utt_id, _, digit, _ in test_utterances}
+
+    start = time.perf_counter()
+    exact = score_batch(reference_mfccs, test_mfcc_dict, true_labels=true_labels)
+    exact_seconds = time.perf_counter() - start
+    exact_correct = exact.predicted_labels == exact.true_labels
+
+    summaries = {}
+    for radius in radii:
+        start = time.perf_counter()
+        approx = score_batch(reference_mfccs, test_mfcc_dict, true_labels=true_labels, fast_dtw_radius=radius)
+        fast_seconds = time.perf_counter() - start
+
+        num_tested = len(exact)
+        relative_error = (approx.distances - exact.distances) / np.maximum(exact.distances, np.finfo(float).tiny)
+        disagreements = int(np.sum(approx.predicted_labels != exact.predicted_labels))
+        summaries[radius] = {
+            'num_tested': num_tested,
+            'decision_disagreements': disagreements,
+            'decision_disagreement_rate': disagreements / num_tested if num_tested else 0.0,
+            'exact_accuracy': float(exact_correct.mean()) if num_tested else 0.0,
+            'fast_accuracy': float(np.mean(approx.predicted_labels == approx.true_labels)) if num_tested else 0.0,
+            'mean_relative_distance_error': float(relative_error.mean()) if num_tested else 0.0,
+            'max_relative_distance_error': float(relative_error.max()) if num_tested else 0.0,
+            'exact_seconds': exact_seconds,
+            'fast_seconds': fast_seconds,
+        }
+    return summaries
+
+
+if __name__ == '__main__':
+    print("Running fast_DTW validation against exact DTW on TDIGITS...")
+    ref_speaker = "jackson"
+    reference_mfccs = load_tdigits_reference_mfcc(config.TDIGITS_BASE_PATH, ref_speaker, config.TDIGITS_DIGITS_STR,
+                                                  config.TDIGITS_REFERENCE_REPETITION, config.MFCC_PARAMS)
+    if not reference_mfccs or all(v is None for v in reference_mfccs.values()):
+        print(f"Error: could not load TDIGITS reference MFCCs for '{ref_speaker}'.")
+        raise SystemExit(1)
+
+    print("Loading TDIGITS test MFCCs...")
+    test_utterances = load_tdigits_test_mfcc(config.TDIGITS_BASE_PATH, config.TDIGITS_SPEAKERS,
+                                             config.TDIGITS_DIGITS_STR, config.TDIGITS_NUM_TEST_REPETITIONS,
+                                             reference_speaker_id=ref_speaker,
+                                             reference_repetition_id=config.TDIGITS_REFERENCE_REPETITION,
+                                             mfcc_params=config.MFCC_PARAMS)
+    print(f"Loaded {len(test_utterances)} test utterances.")
+
+    summaries = compare_fast_dtw_to_exact(reference_mfccs, test_utterances, config.FAST_DTW_VALIDATION_RADII)
+    for radius, summary in summaries.items():
+        print(f"\nRadius {radius}:")
+        print(f"  Decisions differing from exact DTW: {summary['decision_disagreements']}/{summary['num_tested']} "
+              f"({summary['decision_disagreement_rate']*100:.2f}%)")
+        print(f"  Accuracy: exact {summary['exact_accuracy']*100:.2f}%, fast {summary['fast_accuracy']*100:.2f}%")
+        print(f"  Relative distance error: mean {summary['mean_relative_distance_error']*100:.2f}%, "
+              f"max {summary['max_relative_distance_error']*100:.2f}%")
+        print(f"  Time: exact {summary['exact_seconds']:.1f}s, fast {summary['fast_seconds']:.1f}s")
+    print("\nfast_DTW Validation Finished.")
@@ -0,0 +1,222 @@
+# feature_store.py
+import weakref
+import numpy as np
+from collections.abc import Mapping
+from multiprocessing import shared_memory
+
+class SharedFeatureStore(Mapping):
+    """
+    Read-only mapping of utterance keys to MFCC arrays kept in a single
+    shared-memory block.
+
+    All sequences are concatenated along the frame axis into one contiguous
+    buffer; an offsets/lengths table locates each utterance. Lookups return
+    zero-copy NumPy views into that buffer, so a store passed to worker
+    processes only transfers its small metadata table and every worker maps
+    the same physical pages. Keys whose features are None (e.g. failed MFCC
+    extraction) are kept and map to None, matching the dicts returned by
+    `load_mfcc_from_paths`.
+
+    The creating process owns the block: use the store as a context manager
+    (or call `close()` and `unlink()`) to release it. Attached stores only
+    close their own mapping. Closing never invalidates views already handed
+    out; the mapping is released once the last of them is garbage collected.
+
+    After `close()`, every mapping operation (lookup, `in`, `get`, iteration,
+    `len`, `items`) and `descriptor()`/pickling raise ValueError. Only `close()`,
+    `unlink()`, `name`, `closed`, `mapped`, `nbytes` and `repr()` remain valid.
+    """
+
+    def __init__(self, shm, keys, offsets, lengths, frame_shape, dtype, missing=(), owner=False):
+        self._shm = shm
+        self._keys = list(keys)
+        self._missing = set(missing)
+        self._index = {key: i for i, key in enumerate(self._keys)}
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+        self._lengths = np.asarray(lengths, dtype=np.int64)
+        self._frame_shape = tuple(frame_shape)
+        self._dtype = np.dtype(dtype)
+        self._owner = owner
+
+        total_frames = int(self._offsets[-1] + self._lengths[-1]) if len(self._keys) else 0
+        self._buffer = np.ndarray((total_frames,) + self._frame_shape, dtype=self._dtype, buffer=shm.buf)
+        self._buffer.flags.writeable = False
+        # Every view's base is self._buffer, so it outlives all views; unmap only when it is collected.
+        self._release_mapping = weakref.finalize(self._buffer, shm.close)
+
+    @classmethod
+    def from_mfcc_dict(cls, mfcc_dict, dtype=np.float64, name=None):
+        """
+        Copies a dictionary of MFCC arrays into a new shared-memory store.
+
+        Args:
+            mfcc_dict (dict): Mapping of key -> MFCC array (frames x coefficients) or None,
+                as returned by `load_mfcc_from_paths`.
+            dtype (np.dtype): Storage dtype for the features.
+            name (str, optional): Name for the shared-memory block. Chosen by the OS if None.
+
+        Returns:
+            SharedFeatureStore: The owning store.
+        """
+        keys = list(mfcc_dict.keys())
+        arrays = [None if mfcc_dict[key] is None else np.asarray(mfcc_dict[key], dtype=dtype) for key in keys]
+
+        frame_shape = None
+        for key, arr in zip(keys, arrays):
+            if arr is None:
+                continue
+            if arr.ndim == 0:
+                raise ValueError(f"Features for '{key}' must be a sequence, got a scalar.")
+            if frame_shape is None:
+                frame_shape = arr.shape[1:]
+            elif arr.shape[1:] != frame_shape:
+                raise ValueError(f"Features for '{key}' have frame shape {arr.shape[1:]}, expected {frame_shape}.")
+        if frame_shape is None:
+            frame_shape = ()
+
+        lengths = np.array([0 if arr is None else len(arr) for arr in arrays], dtype=np.int64)
+        offsets = np.zeros(len(keys), dtype=np.int64)
+        if len(keys) > 1:
+            offsets[1:] = np.cumsum(lengths)[:-1]
+
+        frame_size = int(np.prod(frame_shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+        # SharedMemory refuses zero-sized blocks, so always reserve at least one byte.
+        nbytes = max(int(lengths.sum()) * frame_size, 1)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=nbytes)
+
+        try:
+            flat = np.ndarray((int(lengths.sum()),) + tuple(frame_shape), dtype=dtype, buffer=shm.buf)
+            for arr, offset, length in zip(arrays, offsets, lengths):
+                if arr is not None:
+                    flat[offset:offset + length] = arr
+            del flat
+            missing = [key for key, arr in zip(keys, arrays) if arr is None]
+            return cls(shm, keys, offsets, lengths, frame_shape, dtype, missing=missing, owner=True)
+        except Exception:
+            shm.close()
+            shm.unlink()
+            raise
+
+    @classmethod
+    def attach(cls, descriptor):
+        """
+        Attaches to an existing store from its `descriptor()` (e.g. inside a worker process).
+        """
+        name, keys, offsets, lengths, frame_shape, dtype, missing = descriptor
+        shm = shared_memory.SharedMemory(name=name, create=False)
+        return cls(shm, keys, offsets, lengths, frame_shape, dtype, missing=missing, owner=False)
+
+    def descriptor(self):
+        """
+        Returns the small, picklable metadata needed to `attach` to this store.
+        """
+        self._check_open()
+        return (self._shm.name, self._keys, self._offsets, self._lengths,
+                self._frame_shape, self._dtype.str, sorted(self._missing, key=self._index.get))
+
+    def __reduce__(self):
+        # Pickling (e.g. sending the store to a multiprocessing worker) ships
+        # only the descriptor; the receiver attaches to the same block.
+        return (SharedFeatureStore.attach, (self.descriptor(),))
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def closed(self):
+        return self._buffer is None
+
+    @property
+    def mapped(self):
+        """ Whether this process still maps the block (closed stores stay mapped while views are alive). """
+        return self._release_mapping.alive
+
+    @property
+    def nbytes(self):
+        return self._buffer.nbytes if self._buffer is not None else 0
+
+    def _check_open(self):
+        if self._buffer is None:
+            raise ValueError(f"SharedFeatureStore {self._shm.name!r} is closed; it cannot be read after close() "
+                             "or after leaving its with block.")
+
+    def __getitem__(self, key):
+        self._check_open()
+        i = self._index[key]
+        if key in self._missing:
+            return None
+        offset = self._offsets[i]
+        return self._buffer[offset:offset + self._lengths[i]]
+
+    def __contains__(self, key):
+        self._check_open()
+        return key in self._index
+
+    def __iter__(self):
+        self._check_open()
+        return iter(self._keys)
+
+    def __len__(self):
+        self._check_open()
+        return len(self._keys)
+
+    def close(self):
+        """
+        Stops handing out views. This process's mapping is closed as soon as no
+        views returned by the store remain, so it is safe to keep using them.
+        """
+        self._buffer = None
+
+    def unlink(self):
+        """
+        Frees the shared-memory block. Only the owning store may unlink.
+        """
+        if self._owner:
+            self._owner = False
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        self.unlink()
+        return False
+
+    def __repr__(self):
+        state = "closed" if self._buffer is None else f"{self.nbytes} bytes"
+        return f"SharedFeatureStore(name={self._shm.name!r}, keys={len(self._keys)}, {state})"
+
+
+if __name__ == '__main__':
+    from recognition_system import isolated_digit_recognition
+    print("Running Shared Feature Store Example...")
+
+    dummy_train_mfcc = {"one": np.random.rand(50, 13), "two": np.random.rand(55, 13), "three": None}
+    dummy_test_mfcc = {f"utt_{i}": np.random.rand(40 + i, 13) for i in range(8)}
+
+    # batch_scoring.score_batch(..., num_workers=N) uses these stores to share features with its pool.
+    with SharedFeatureStore.from_mfcc_dict(dummy_train_mfcc) as train_store, \
+         SharedFeatureStore.from_mfcc_dict(dummy_test_mfcc) as test_store:
+        print(f"Train store: {train_store}")
+        print(f"Test store: {test_store}")
+        assert np.array_equal(train_store["one"], dummy_train_mfcc["one"])
+        assert train_store["three"] is None
+        held_view = train_store["one"][5:10]
+
+        for key in test_store:
+            recognized, dist = isolated_digit_recognition(train_store, test_store[key])
+            print(f"  {key}: recognized '{recognized}' (distance {dist:.2f})")
+
+    # A view kept past the with block stays readable; the mapping is released once it is dropped.
+    assert train_store.closed and train_store.mapped
+    assert np.array_equal(held_view, dummy_train_mfcc["one"][5:10])
+    del held_view
+    assert not train_store.mapped
+    try:
+        "one" in train_store
+    except ValueError as e:
+        print(f"Using the store after close() fails clearly: {e}")
+
+    print("Shared Feature Store Example Finished.")
@@ -1,6 +1,8 @@
 # html_reporter.py
 from jinja2 import Environment, FileSystemLoader
 import os
+from concurrent.futures import Future
+from plot_renderer import resolve_plot_path
 # import base64 # For embedding images directly if preferred, or use file paths
 
 # def fig_to_base64(fig_path):
@@ -14,6 +16,8 @@ import os
 def generate_html_report(report_data, template_name="report_template.html", output_filename="assignment_report.html"):
     """
     Generates an HTML report from the collected data.
+    Plot entries may be Futures from PlotRenderer; only those embedded in the
+    report are waited on, and failed renders are reported as missing plots.
     """
     if not os.path.exists("plots"): # Should have been created by main
         os.makedirs("plots")
@@ -22,7 +26,9 @@ def generate_html_report(report_data, template_name="report_template.html", outp
     for part_key, part_results in report_data.items():
         if isinstance(part_results, dict):
             for key, value in part_results.items():
-                if isinstance(value, str) and value.startswith("plots" + os.sep) and value.endswith(".png"):
+                if isinstance(value, Future):
+                    report_data[part_key][key] = resolve_plot_path(value)
+                elif isinstance(value, str) and value.startswith("plots" + os.sep) and value.endswith(".png"):
                     # Make path relative if it's absolute for some reason, or just ensure it's correct
                     report_data[part_key][key] = os.path.join(value) # os.path.join will normalize
                 elif key == "confusion_matrix_array" and value is not None: # Ensure it's a list for Jinja
@@ -2,17 +2,20 @@
 import os
 import numpy as np
 
-from dtw_core import DTW, plotDTWpath
+from dtw_core import DTW
 from audio_processing import load_mfcc_from_paths
 from recognition_system import isolated_digit_recognition
 from evaluation import (
-    calculate_accuracy_and_confusion_matrix, 
-    plot_confusion_matrix,
+    score_test_sets,
+    accuracy_and_confusion_matrix_from_scores,
+    per_speaker_accuracy_from_scores,
     load_tdigits_reference_mfcc,
-    evaluate_on_tdigits
+    load_tdigits_test_mfcc,
+    score_tdigits
 )
 import config
 from html_reporter import generate_html_report
+from plot_renderer import PlotRenderer
 
 REPORT_DATA = {
     "part_a_results": None,
@@ -31,7 +34,7 @@ def ensure_data_dirs_exist():
          print(f"Warning: TDIGITS directory not found: {config.TDIGITS_BASE_PATH}")
          print(f"Please download and place the TDIGITS_subset folder here.")
 
-def part_a():
+def part_a(renderer):
     print("\n--- Running Part (a): Basic DTW ---")
     results = {}
     sequenceA = [4, 3, 7, 0, 2, 6, 5]
@@ -40,13 +43,15 @@ def part_a():
     results['sequence_b'] = sequenceB
     
     try:
-        dist, path, _ = DTW(sequenceA, sequenceB)
+        dtw_result = DTW(sequenceA, sequenceB)
+        dist, path, _ = dtw_result
         results['dtw_distance'] = dist
         print(f"Optimal DTW Distance between A and B: {dist:.2f}")
         
         plot_save_path = os.path.join("plots", "part_a_dtw_plot.png")
-        plotDTWpath(sequenceA, sequenceB, title_prefix="Part (a) Example: ", save_path=plot_save_path)
-        results['plot_path'] = plot_save_path if os.path.exists(plot_save_path) else None
+        # Rendered in the background; the HTML report waits for it.
+        results['plot_path'] = renderer.submit_dtw_plot(sequenceA, sequenceB, title_prefix="Part (a) Example: ",
+                                                        save_path=plot_save_path, dtw_result=dtw_result)
     except Exception as e:
         print(f"Error in Part A: {e}")
         results['error'] = str(e)
@@ -54,7 +59,7 @@ def part_a():
     REPORT_DATA["part_a_results"] = results
     print("--- Part (a) Finished ---")
 
-def part_b():
+def part_b(renderer):
     print("\n--- Running Part (b): Isolated Digit Recognition (Your Recordings) ---")
     results = {}
     
@@ -105,9 +110,8 @@ def part_b():
     mfcc_s1 = test1_mfcc.get(s_label1)
     mfcc_s2 = test2_mfcc.get(s_label2)
     if mfcc_s1 is not None and mfcc_s2 is not None:
-        plot_path_s = plotDTWpath(mfcc_s1, mfcc_s2,
+        results['same_digit_plot_path'] = renderer.submit_dtw_plot(mfcc_s1, mfcc_s2,
                                 title_prefix=f"Part (b) Same ({s_label1}): ", save_path=os.path.join("plots", f"part_b_same_{s_label1}.png"))
-        results['same_digit_plot_path'] = plot_path_s if plot_path_s and os.path.exists(plot_path_s) else None
     else:
         print(f"Skipping same digit plot: MFCCs for '{s_label1}' or '{s_label2}' not available.")
     
@@ -116,9 +120,8 @@ def part_b():
     mfcc_dA = test1_mfcc.get(d_labelA)
     mfcc_dB = train_mfcc.get(d_labelB)
     if mfcc_dA is not None and mfcc_dB is not None:
-        plot_path_d = plotDTWpath(mfcc_dA, mfcc_dB,
+        results['diff_digit_plot_path'] = renderer.submit_dtw_plot(mfcc_dA, mfcc_dB,
                                 title_prefix=f"Part (b) Diff ({d_labelA} vs {d_labelB}): ", save_path=os.path.join("plots",f"part_b_diff_{d_labelA}_{d_labelB}.png"))
-        results['diff_digit_plot_path'] = plot_path_d if plot_path_d and os.path.exists(plot_path_d) else None
     else:
         print(f"Skipping different digit plot: MFCCs for '{d_labelA}' or '{d_labelB}' not available.")
         
@@ -129,15 +132,17 @@ def part_b():
             all_test_sets_mfcc.append(mfcc_set)
 
     if all_test_sets_mfcc:
-        accuracy, confusion_mat_arr = calculate_accuracy_and_confusion_matrix(
-            train_mfcc, all_test_sets_mfcc, config.DIGITS_ORDERED
-        )
+        # DTW runs once here; accuracy and the confusion matrix come from the stored scores.
+        scores_b = score_test_sets(train_mfcc, all_test_sets_mfcc, config.DIGITS_ORDERED,
+                                   top_k=config.SCORES_TOP_K, num_workers=config.SCORING_WORKERS)
+        scores_b.save_npz(os.path.join(config.SCORES_DIR, "part_b_scores.npz"))
+        accuracy, confusion_mat_arr = accuracy_and_confusion_matrix_from_scores(scores_b, config.DIGITS_ORDERED)
         results['accuracy'] = accuracy
         results['confusion_matrix_array'] = confusion_mat_arr.tolist()
         print(f"\nOverall Accuracy on Your Recordings: {accuracy*100:.2f}%")
         
-        cm_plot_path = plot_confusion_matrix(confusion_mat_arr, config.DIGITS_ORDERED, accuracy, save_path=os.path.join("plots","part_b_cm.png"))
-        results['confusion_matrix_plot_path'] = cm_plot_path if cm_plot_path and os.path.exists(cm_plot_path) else None
+        results['confusion_matrix_plot_path'] = renderer.submit_confusion_matrix(
+            confusion_mat_arr, config.DIGITS_ORDERED, accuracy, save_path=os.path.join("plots","part_b_cm.png"))
     else:
         print("No valid test MFCC sets for Part B evaluation.")
         results['accuracy'] = "N/A (No valid test data)"
@@ -158,35 +163,46 @@ def part_c():
         REPORT_DATA["part_c_results"] = results
         return
 
+    ref_speaker = "jackson" 
+    results['ref_speaker_same'] = ref_speaker
+    results['ref_speaker_cross'] = ref_speaker
+    tdigits_ref = load_tdigits_reference_mfcc(config.TDIGITS_BASE_PATH, ref_speaker, config.TDIGITS_DIGITS_STR, 
+                                              config.TDIGITS_REFERENCE_REPETITION, config.MFCC_PARAMS)
+    if tdigits_ref and not all(v is None for v in tdigits_ref.values()):
+        print("Loading TDIGITS test MFCCs for all speakers...")
+        test_utterances = load_tdigits_test_mfcc(config.TDIGITS_BASE_PATH, config.TDIGITS_SPEAKERS, config.TDIGITS_DIGITS_STR,
+                                                 num_test_repetitions=config.TDIGITS_NUM_TEST_REPETITIONS,
+                                                 reference_speaker_id=ref_speaker,
+                                                 reference_repetition_id=config.TDIGITS_REFERENCE_REPETITION,
+                                                 mfcc_params=config.MFCC_PARAMS)
+        # One scoring pass serves both evaluations; per-speaker results are read from the stored scores.
+        scores_c = score_tdigits(tdigits_ref, test_utterances, top_k=config.SCORES_TOP_K,
+                                 num_workers=config.SCORING_WORKERS)
+        scores_c.save_npz(os.path.join(config.SCORES_DIR, "part_c_scores.npz"))
+        per_speaker = per_speaker_accuracy_from_scores(scores_c)
+    else:
+        per_speaker = None
+
     print("\nPart (c).1: Same-Speaker Evaluation (TDIGITS)")
-    ref_speaker_s = "jackson" 
-    results['ref_speaker_same'] = ref_speaker_s
-    tdigits_ref_s = load_tdigits_reference_mfcc(config.TDIGITS_BASE_PATH, ref_speaker_s, config.TDIGITS_DIGITS_STR, 
-                                                config.TDIGITS_REFERENCE_REPETITION, config.MFCC_PARAMS)
-    if tdigits_ref_s and not all(v is None for v in tdigits_ref_s.values()):
-        acc_s, _, _ = evaluate_on_tdigits(tdigits_ref_s, ref_speaker_s, config.TDIGITS_DIGITS_STR, config.TDIGITS_BASE_PATH,
-                                          num_test_repetitions=config.TDIGITS_NUM_TEST_REPETITIONS,
-                                          reference_repetition_id=config.TDIGITS_REFERENCE_REPETITION,
-                                          reference_speaker_id=ref_speaker_s, mfcc_params=config.MFCC_PARAMS)
+    if per_speaker is not None:
+        acc_s, correct_s, tested_s = per_speaker.get(ref_speaker, (0.0, 0, 0))
+        print(f"Evaluating TDIGITS: Ref '{ref_speaker}', Test '{ref_speaker}'")
+        print(f"  Results: {correct_s}/{tested_s}. Acc: {acc_s*100:.2f}%")
         results['same_speaker_accuracy'] = acc_s
     else:
-        print(f"Could not load reference set for TDIGITS speaker '{ref_speaker_s}'. Evaluation might be affected.")
+        print(f"Could not load reference set for TDIGITS speaker '{ref_speaker}'. Evaluation might be affected.")
         results['same_speaker_accuracy'] = "N/A (Ref data error)"
 
     print("\nPart (c).2: Cross-Speaker Evaluation (TDIGITS)")
-    ref_speaker_c = "jackson" 
-    results['ref_speaker_cross'] = ref_speaker_c
-    tdigits_ref_c = tdigits_ref_s # Reuse Jackson's reference
-    
     cross_accuracies = {}
     overall_cross_correct = 0
     overall_cross_tested = 0
-    if tdigits_ref_c and not all(v is None for v in tdigits_ref_c.values()):
+    if per_speaker is not None:
         for test_speaker in config.TDIGITS_SPEAKERS:
-            if test_speaker == ref_speaker_c: continue
-            acc_c, correct_c, tested_c = evaluate_on_tdigits(tdigits_ref_c, test_speaker, config.TDIGITS_DIGITS_STR, config.TDIGITS_BASE_PATH,
-                                                             num_test_repetitions=config.TDIGITS_NUM_TEST_REPETITIONS,
-                                                             reference_speaker_id=ref_speaker_c, mfcc_params=config.MFCC_PARAMS)
+            if test_speaker == ref_speaker: continue
+            acc_c, correct_c, tested_c = per_speaker.get(test_speaker, (0.0, 0, 0))
+            print(f"Evaluating TDIGITS: Ref '{ref_speaker}', Test '{test_speaker}'")
+            print(f"  Results: {correct_c}/{tested_c}. Acc: {acc_c*100:.2f}%")
             cross_accuracies[test_speaker] = acc_c
             overall_cross_correct += correct_c
             overall_cross_tested += tested_c
@@ -197,7 +213,7 @@ def part_c():
             print("No cross-speaker tests were successfully performed (all_cross_tested = 0).")
             results['overall_cross_speaker_accuracy'] = "N/A (No test data)"
     else:
-        print(f"Could not load/use reference set for TDIGITS speaker '{ref_speaker_c}' for cross-speaker eval.")
+        print(f"Could not load/use reference set for TDIGITS speaker '{ref_speaker}' for cross-speaker eval.")
         results['cross_speaker_accuracies'] = {}
         results['overall_cross_speaker_accuracy'] = "N/A (Ref data error)"
         
@@ -215,14 +231,16 @@ if __name__ == "__main__":
     print("Starting Isolated Digit Recognition Assignment Script...")
     ensure_data_dirs_exist()
 
-    if config.RUN_PART_A:
-        part_a()
-    if config.RUN_PART_B:
-        part_b()
-    if config.RUN_PART_C:
-        part_c()
-    
-    generate_html_report(REPORT_DATA)
+    # Plots render in background processes while the remaining parts are evaluated.
+    with PlotRenderer(max_workers=config.PLOT_WORKERS) as renderer:
+        if config.RUN_PART_A:
+            part_a(renderer)
+        if config.RUN_PART_B:
+            part_b(renderer)
+        if config.RUN_PART_C:
+            part_c()
+        
+        generate_html_report(REPORT_DATA)
     
     print("\nAssignment Script Finished.")
     print("HTML report generated as 'assignment_report.html'.")
@@ -0,0 +1,96 @@
+# plot_renderer.py
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+
+def _init_plot_worker():
+    # Workers never show windows, so force the non-interactive backend before any figure is made.
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+def _render_dtw(distance_matrix, accumulated_matrix, optimal_path, optimal_distance, title_prefix, save_path):
+    from dtw_core import render_dtw_plot
+    return render_dtw_plot(distance_matrix, accumulated_matrix, optimal_path, optimal_distance,
+                           title_prefix=title_prefix, save_path=save_path)
+
+def _render_confusion_matrix(confusion_mat_array, digits_ordered, accuracy, save_path):
+    from evaluation import plot_confusion_matrix
+    return plot_confusion_matrix(confusion_mat_array, digits_ordered, accuracy, save_path=save_path)
+
+
+class PlotRenderer:
+    """
+    Renders figures in a background process pool so that evaluation in the
+    main process keeps running while plots are drawn and saved.
+
+    Each submit_* method returns a Future resolving to the saved figure path
+    (or None). Only pass a save_path: pool workers use the Agg backend and
+    cannot show figures interactively.
+    """
+
+    def __init__(self, max_workers=None):
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_plot_worker)
+
+    def submit_dtw_plot(self, sequence1, sequence2, title_prefix="", save_path=None,
+                        local_cost_matrix=None, dtw_result=None):
+        """
+        Queues a DTW path plot. The DTW matrices are computed here (or reused if
+        given) so the worker only has to draw them.
+        """
+        from dtw_core import prepare_dtw_plot_data
+
+        local_cost_matrix, dtw_result = prepare_dtw_plot_data(sequence1, sequence2, local_cost_matrix, dtw_result)
+        optimal_distance, optimal_path, accumulated_matrix = dtw_result
+        return self._executor.submit(_render_dtw, local_cost_matrix, accumulated_matrix, optimal_path,
+                                     optimal_distance, title_prefix, save_path)
+
+    def submit_confusion_matrix(self, confusion_mat_array, digits_ordered, accuracy, save_path=None):
+        """ Queues a confusion matrix plot. """
+        return self._executor.submit(_render_confusion_matrix, confusion_mat_array, digits_ordered,
+                                     accuracy, save_path)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown(wait=True)
+        return False
+
+
+def resolve_plot_path(value):
+    """
+    Waits for a plot Future (if given one) and returns the saved path, or None
+    if rendering failed or the file does not exist. Plain paths pass through
+    the same existence check.
+    """
+    if isinstance(value, Future):
+        try:
+            value = value.result()
+        except Exception as e:
+            print(f"Error rendering plot: {e}")
+            return None
+    if isinstance(value, str) and os.path.exists(value):
+        return value
+    return None
+
+
+if __name__ == '__main__':
+    import numpy as np
+    print("Running Plot Renderer Example...")
+
+    if not os.path.exists("plots"):
+        os.makedirs("plots")
+
+    with PlotRenderer(max_workers=2) as renderer:
+        dtw_future = renderer.submit_dtw_plot([4, 3, 7, 0, 2, 6, 5], [3, 7, 1, 6, 1, 5, 4, 4],
+                                              title_prefix="Renderer Example: ",
+                                              save_path="plots/plot_renderer_example_dtw.png")
+        cm_future = renderer.submit_confusion_matrix(np.array([[3, 1], [0, 4]]), ["0", "1"], 0.875,
+                                                     save_path="plots/plot_renderer_example_cm.png")
+        print("Plots queued; main process is free to continue.")
+        print(f"DTW plot: {resolve_plot_path(dtw_future)}")
+        print(f"Confusion matrix plot: {resolve_plot_path(cm_future)}")
+
+    print("Plot Renderer Example Finished.")
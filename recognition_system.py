@@ -1,10 +1,11 @@
 # recognition_system.py
-from dtw_core import DTW 
+from dtw_core import DTW, fast_DTW
 
-def isolated_digit_recognition(train_mfcc_dict, test_mfcc_sequence):
+def isolated_digit_recognition(train_mfcc_dict, test_mfcc_sequence, fast_dtw_radius=None):
     """
     Recognizes a digit from a test MFCC sequence by comparing it against 
     a dictionary of training MFCC sequences using DTW.
+    If fast_dtw_radius is given, the approximate fast_DTW is used with that radius.
     """
     if not train_mfcc_dict or test_mfcc_sequence is None:
         # print("Error: Training data or test sequence is empty/None for recognition.") # Can be too verbose
@@ -18,7 +19,10 @@ def isolated_digit_recognition(train_mfcc_dict, test_mfcc_sequence):
             # print(f"Warning: Reference MFCC for training digit '{digit_name}' is None. Skipping.") # Can be too verbose
             continue
             
-        distance, _, _ = DTW(test_mfcc_sequence, reference_mfcc_sequence)
+        if fast_dtw_radius is None:
+            distance, _, _ = DTW(test_mfcc_sequence, reference_mfcc_sequence)
+        else:
+            distance, _, _ = fast_DTW(test_mfcc_sequence, reference_mfcc_sequence, radius=fast_dtw_radius)
         
         if distance < min_dtw_distance:
             min_dtw_distance = distance